@@ -1,13 +1,33 @@
 #!/usr/bin/env python3
+import os
+import shutil
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict
 
+try:
+    # In-process ripgrep (see rgbind-rs/); avoids spawning rg for every search
+    import rgbind
+except ImportError:
+    rgbind = None
+
+# Limits applied to every search, on both the rg and the rgbind path
+MAX_COLUMNS = 512
+MAX_FILESIZE_MB = 10
+THREADS = os.cpu_count() or 1
+
 def run_ripgrep_search(pattern: str, file_types: List[str] = None,
-                       context_before: int = 2, context_after: int = 3) -> str:
-    """Execute a ripgrep search with given parameters"""
+                       context_before: int = 2, context_after: int = 3) -> bytes:
+    """Execute a ripgrep search with given parameters, returning rg's raw output"""
 
-    cmd = ['rg', '--no-heading', '--line-number', '--color=never']
+    if rgbind is not None:
+        return _search_with_binding(pattern, file_types,
+                                    context_before, context_after)
+
+    cmd = ['rg', '--no-heading', '--line-number', '--color=never',
+           f'--max-columns={MAX_COLUMNS}', f'--max-filesize={MAX_FILESIZE_MB}M',
+           '-j', str(THREADS)]
 
     # Add context lines
     if context_before > 0:
@@ -23,12 +43,48 @@ def run_ripgrep_search(pattern: str, file_types: List[str] = None,
     # Add the search pattern
     cmd.append(pattern)
 
+    result = subprocess.run(cmd, capture_output=True, check=False)
+    # Exit code 2 is an error such as a bad pattern; report it and keep going
+    if result.returncode == 2:
+        sys.stderr.buffer.write(result.stderr)
+    return result.stdout
+
+def _search_with_binding(pattern: str, file_types: List[str],
+                         context_before: int, context_after: int) -> bytes:
+    """Run the search through rgbind, formatted like rg's --no-heading output"""
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, check=False)
-        return result.stdout
-    except FileNotFoundError:
-        print("Error: ripgrep (rg) is not installed")
-        sys.exit(1)
+        matches = rgbind.search(pattern, '.', file_types or [],
+                                max(context_before, 0), max(context_after, 0),
+                                max_columns=MAX_COLUMNS,
+                                max_filesize=MAX_FILESIZE_MB * 1024 * 1024,
+                                threads=THREADS)
+    except ValueError as e:
+        # Same as the rg path: report the error and return no output
+        print(f"rg: {e}", file=sys.stderr)
+        return b''
+
+    with_context = context_before > 0 or context_after > 0
+    lines = []
+    prev_path, prev_line = None, None
+    for m in matches:
+        # rg prints paths under the implicit "." root without the "./"
+        path = m.path[2:] if m.path.startswith('./') else m.path
+        # rg separates non-adjacent context groups, and files, with "--"
+        if with_context and prev_path is not None and (
+                path != prev_path or m.line_number != prev_line + 1):
+            lines.append('--\n')
+        prev_path, prev_line = path, m.line_number
+
+        sep = ':' if m.is_match else '-'
+        # A file's last line may have no terminator
+        text = m.text if m.text.endswith('\n') else m.text + '\n'
+        lines.append(f"{path}{sep}{m.line_number}{sep}{text}")
+    return ''.join(lines).encode()
+
+def print_output(output: bytes):
+    """Print raw search output without decoding it"""
+    sys.stdout.flush()
+    sys.stdout.buffer.write(output + b'\n')
 
 def main():
     # Service endpoints to migrate: {service_name: endpoint_path}
@@ -38,24 +94,43 @@ def main():
         # Add more service endpoints here
     }
 
-    for service_name, endpoint in service_endpoints.items():
-        print(f"\n{'='*60}")
-        print(f"Service: {service_name}")
-        print(f"Endpoint: {endpoint}")
-        print('='*60)
+    # Check once up front rather than failing in every worker thread
+    if rgbind is None and shutil.which('rg') is None:
+        print("Error: ripgrep (rg) is not installed")
+        sys.exit(1)
+
+    # The searches are independent and spend their time in rg, so run them
+    # concurrently and print the results in service order afterwards
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        # The HTTP client search doesn't depend on the service, so run it once
+        http_client_search = executor.submit(
+            run_ripgrep_search, '(RestTemplate|requests|HttpClient|WebClient)',
+            ['java', 'py'])
+
+        searches = {}
+        for service_name, endpoint in service_endpoints.items():
+            # Search for direct endpoint path references
+            searches[service_name, 'endpoint'] = executor.submit(
+                run_ripgrep_search, endpoint)
+
+            # Search for service name references
+            searches[service_name, 'service'] = executor.submit(
+                run_ripgrep_search, service_name)
+
+        for service_name, endpoint in service_endpoints.items():
+            print(f"\n{'='*60}")
+            print(f"Service: {service_name}")
+            print(f"Endpoint: {endpoint}")
+            print('='*60)
 
-        # Search for direct endpoint path references
-        print("\n1. Direct endpoint references:")
-        print(run_ripgrep_search(endpoint))
+            print("\n1. Direct endpoint references:")
+            print_output(searches[service_name, 'endpoint'].result())
 
-        # Search for service name references
-        print(f"\n2. Service name references ({service_name}):")
-        print(run_ripgrep_search(service_name))
+            print(f"\n2. Service name references ({service_name}):")
+            print_output(searches[service_name, 'service'].result())
 
-        # Search for common HTTP patterns
-        print("\n3. HTTP client usage:")
-        print(run_ripgrep_search('(RestTemplate|requests|HttpClient|WebClient)',
-                                ['java', 'py']))
+            print("\n3. HTTP client usage:")
+            print_output(http_client_search.result())
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
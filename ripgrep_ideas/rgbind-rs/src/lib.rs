@@ -0,0 +1,145 @@
+// In-process ripgrep search exposed to Python, so callers skip the
+// fork+exec+pipe cost of spawning `rg` for every pattern. Used by
+// rg_script.py only; ripgrep.py's searches still spawn `rg`.
+//
+// Build with `maturin develop` from this directory.
+
+use std::sync::Mutex;
+
+use grep::regex::RegexMatcherBuilder;
+use grep::searcher::{
+    BinaryDetection, Searcher, SearcherBuilder, Sink, SinkContext, SinkMatch,
+};
+use ignore::types::TypesBuilder;
+use ignore::{WalkBuilder, WalkState};
+use pyo3::exceptions::PyValueError;
+use pyo3::prelude::*;
+
+#[pyclass(get_all)]
+struct Match {
+    path: String,
+    line_number: u64,
+    is_match: bool,
+    text: String,
+}
+
+struct Collect<'a> {
+    path: &'a str,
+    max_columns: Option<usize>,
+    out: &'a mut Vec<Match>,
+}
+
+impl Collect<'_> {
+    fn push(&mut self, line_number: Option<u64>, is_match: bool, bytes: &[u8]) {
+        // Mirror rg --max-columns: long lines are replaced, not printed
+        let text = match self.max_columns {
+            Some(max) if bytes.len() > max => "[Omitted long line]\n".to_owned(),
+            _ => String::from_utf8_lossy(bytes).into_owned(),
+        };
+        self.out.push(Match {
+            path: self.path.to_owned(),
+            line_number: line_number.unwrap_or(0),
+            is_match,
+            text,
+        });
+    }
+}
+
+impl Sink for Collect<'_> {
+    type Error = std::io::Error;
+
+    fn matched(&mut self, _: &Searcher, m: &SinkMatch<'_>) -> Result<bool, Self::Error> {
+        self.push(m.line_number(), true, m.bytes());
+        Ok(true)
+    }
+
+    fn context(&mut self, _: &Searcher, c: &SinkContext<'_>) -> Result<bool, Self::Error> {
+        self.push(c.line_number(), false, c.bytes());
+        Ok(true)
+    }
+}
+
+/// Search `root` for `pattern` the way `rg` does: parallel gitignore-aware
+/// walk, binary files skipped at the first NUL, optional `-t` type filters,
+/// `-B`/`-A` context lines, and the `--max-columns`, `--max-filesize` and
+/// `-j` limits.
+#[pyfunction]
+#[pyo3(signature = (
+    pattern, root, types=Vec::new(), before=0, after=0,
+    max_columns=None, max_filesize=None, threads=0,
+))]
+#[allow(clippy::too_many_arguments)]
+fn search(
+    py: Python<'_>,
+    pattern: &str,
+    root: &str,
+    types: Vec<String>,
+    before: usize,
+    after: usize,
+    max_columns: Option<usize>,
+    max_filesize: Option<u64>,
+    threads: usize,
+) -> PyResult<Vec<Match>> {
+    let matcher = RegexMatcherBuilder::new()
+        .line_terminator(Some(b'\n'))
+        .build(pattern)
+        .map_err(|e| PyValueError::new_err(e.to_string()))?;
+
+    let mut type_builder = TypesBuilder::new();
+    type_builder.add_defaults();
+    for t in &types {
+        type_builder.select(t);
+    }
+    let file_types = type_builder
+        .build()
+        .map_err(|e| PyValueError::new_err(e.to_string()))?;
+
+    let walker = WalkBuilder::new(root)
+        .types(file_types)
+        .max_filesize(max_filesize)
+        .threads(threads)
+        .build_parallel();
+
+    let out = Mutex::new(Vec::new());
+    py.allow_threads(|| {
+        walker.run(|| {
+            let matcher = matcher.clone();
+            let mut searcher = SearcherBuilder::new()
+                .line_number(true)
+                .binary_detection(BinaryDetection::quit(b'\x00'))
+                .before_context(before)
+                .after_context(after)
+                .build();
+            let out = &out;
+            Box::new(move |entry| {
+                let entry = match entry {
+                    Ok(entry) => entry,
+                    Err(_) => return WalkState::Continue,
+                };
+                if !entry.file_type().map_or(false, |ft| ft.is_file()) {
+                    return WalkState::Continue;
+                }
+                let path = entry.path().to_string_lossy().into_owned();
+                let mut found = Vec::new();
+                // Unreadable files are skipped, as rg does
+                let _ = searcher.search_path(
+                    &matcher,
+                    entry.path(),
+                    Collect { path: &path, max_columns, out: &mut found },
+                );
+                if !found.is_empty() {
+                    out.lock().unwrap().extend(found);
+                }
+                WalkState::Continue
+            })
+        });
+    });
+    Ok(out.into_inner().unwrap())
+}
+
+#[pymodule]
+fn rgbind(m: &Bound<'_, PyModule>) -> PyResult<()> {
+    m.add_class::<Match>()?;
+    m.add_function(wrap_pyfunction!(search, m)?)?;
+    Ok(())
+}
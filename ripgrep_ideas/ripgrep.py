@@ -1,223 +1,358 @@
 
+import os
 import subprocess
-import json
+import sys
 import re
+from array import array
+from collections import defaultdict
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Set
+from typing import List, Dict, Optional, Set
+
+# Applied to every rg call: bounds per-line and per-file cost on generated or
+# minified files, and uses every core for the directory walk
+RG_TUNING = ['--max-columns=512', '--max-filesize=10M',
+             '-j', str(os.cpu_count() or 1)]
+
+# Plain "path\0line:content" match lines: far cheaper to parse than --json,
+# and the NUL keeps paths containing ':' unambiguous. --no-config so flags in
+# the user's RIPGREP_CONFIG_PATH (e.g. --column) can't change the layout
+RG_MATCH_FORMAT = ['--no-config', '--no-heading', '--with-filename',
+                   '--line-number', '--null', '--color=never']
+
+# rg type filters; these are compiled into one globset at startup, which is
+# cheaper than matching every path against a brace-expanded -g glob. Custom
+# types with names that don't collide with rg's built-in ones, since
+# --type-add extends an existing type (java also covers .properties and .jsp,
+# config covers .cfg and .config)
+CODE_TYPES = ['--type-add=code:*.{java,py,kt,scala}', '-tcode']
+JVM_TYPES = ['--type-add=jvm:*.{java,kt,scala}', '-tjvm']
+PY_TYPES = ['--type-add=pyfile:*.py', '-tpyfile']
+CONFIG_TYPES = ['--type-add=appconfig:*.{properties,yml,yaml,json,conf,ini,env}',
+                '-tappconfig']
+
+# Extensions of config files that define property keys
+_CONFIG_EXTS = frozenset({'.properties', '.yml', '.yaml', '.env', '.conf', '.ini'})
+
+# Property key at the start of a config line: "api.url=..." or "api_url: ..."
+KEY_RE = re.compile(r'^\s*([\w.-]+)\s*[:=]')
+
+@lru_cache(maxsize=1024)
+def _escape(text: str) -> str:
+    """re.escape, memoized for keys and variables that are searched repeatedly"""
+    return re.escape(text)
+
+@lru_cache(maxsize=None)
+def _keys_from_lines(lines: tuple) -> frozenset:
+    """Property keys defined on the given config lines, memoized per file hit"""
+    keys = set()
+    for content in lines:
+        key_match = KEY_RE.match(content)
+        if key_match:
+            keys.add(key_match.group(1))
+    return frozenset(keys)
 
 class EndpointMigrationTracker:
+    # Common patterns for property access, %-formatted with the escaped key
+    _PROP_FMT = [
+        # Java patterns
+        '@Value.*%s',
+        'getProperty.*%s',
+        'getString.*%s',
+        'properties\\.get.*%s',
+        
+        # Python patterns
+        'config\\[.*%s.*\\]',
+        'os\\.environ.*%s',
+        'settings\\.%s',
+        'get.*%s',
+    ]
+    
+    # HTTP client patterns for different libraries
+    _JAVA_HTTP_PATTERNS = [
+        # RestTemplate (Spring)
+        'restTemplate\\.(get|post|put|delete|exchange)ForObject',
+        'restTemplate\\.exchange',
+        
+        # WebClient (Spring WebFlux)
+        'webClient\\..*\\.(get|post|put|delete)\\(\\)',
+        
+        # Apache HttpClient
+        'HttpGet|HttpPost|HttpPut|HttpDelete',
+        'httpClient\\.execute',
+        
+        # OkHttp
+        'Request\\.Builder\\(\\)',
+        'okHttpClient\\.newCall',
+        
+        # Retrofit
+        '@(GET|POST|PUT|DELETE)\\(',
+        
+        # JAX-RS
+        '@Path\\(',
+    ]
+    
+    _PYTHON_HTTP_PATTERNS = [
+        # requests library
+        'requests\\.(get|post|put|delete|patch)',
+        
+        # urllib
+        'urllib\\.request\\.urlopen',
+        'urllib2\\.urlopen',
+        
+        # httpx
+        'httpx\\.(get|post|put|delete)',
+        
+        # aiohttp
+        'session\\.(get|post|put|delete)',
+        'aiohttp\\.ClientSession',
+        
+        # FastAPI/Flask client calls
+        'client\\.(get|post|put|delete)',
+    ]
+    
+    # Above this many prefilter hits, searching the project root is faster
+    # than handing rg the paths, and keeps argv well under the OS limit
+    _MAX_CANDIDATES = 1000
+    
     def __init__(self, project_root: str, urls: List[str]):
         self.project_root = project_root
         self.urls = urls
         self.findings = {}
+        self._http_cache = None
         
     def search_literal_urls(self, url: str) -> Dict:
         """Phase 1: Find literal URL occurrences"""
         commands = [
             # Search in all files for exact URL
-            ['rg', '--json', '-i', url, self.project_root],
+            ['rg', '-i', url],
             
             # Search for URL parts (domain, path separately)
-            ['rg', '--json', '-i', url.split('/')[-1], self.project_root],
+            ['rg', '-i', url.split('/')[-1]],
             
             # Search in properties/config files specifically
-            ['rg', '--json', '-g', '*.{properties,yml,yaml,json,conf,ini,env}', 
-             url, self.project_root],
+            ['rg', *CONFIG_TYPES, url],
         ]
         return self._execute_searches(commands)
     
-    def search_property_references(self, property_key: str) -> Dict:
-        """Phase 2: Find references to property keys"""
-        # Common patterns for property access
-        patterns = [
-            # Java patterns
-            f'@Value.*{property_key}',
-            f'getProperty.*{property_key}',
-            f'getString.*{property_key}',
-            f'properties\\.get.*{property_key}',
-            
-            # Python patterns
-            f'config\\[.*{property_key}.*\\]',
-            f'os\\.environ.*{property_key}',
-            f'settings\\.{property_key}',
-            f'get.*{property_key}',
-        ]
+    def search_property_references(self, property_key: str,
+                                   max_count: Optional[int] = None) -> Dict:
+        """Phase 2: Find references to property keys
         
-        commands = []
-        for pattern in patterns:
-            commands.append(['rg', '--json', '-e', pattern, 
-                           '-g', '*.{java,py,kt,scala}', self.project_root])
+        max_count stops rg after that many matches per file, for callers
+        that only need evidence of use rather than every reference.
+        """
+        key = _escape(property_key)
+        patterns = [fmt % key for fmt in self._PROP_FMT]
         
-        return self._execute_searches(commands)
+        # Only files containing the key at all can match any pattern
+        candidates = self._candidate_files(property_key, CODE_TYPES)
+        if candidates == []:
+            return {}
+        
+        # All access patterns compiled into one matcher, one rg process
+        cmd = ['rg', *CODE_TYPES]
+        if max_count is not None:
+            cmd.extend(['-m', str(max_count)])
+        commands = [
+            cmd + [arg for pattern in patterns for arg in ('-e', pattern)],
+        ]
+        
+        return self._execute_searches(commands, candidates)
     
     def search_http_calls(self) -> Dict:
         """Phase 3: Find HTTP client usage patterns"""
         
-        # HTTP client patterns for different libraries
-        java_patterns = [
-            # RestTemplate (Spring)
-            'restTemplate\\.(get|post|put|delete|exchange)ForObject',
-            'restTemplate\\.exchange',
-            
-            # WebClient (Spring WebFlux)
-            'webClient\\..*\\.(get|post|put|delete)\\(\\)',
-            
-            # Apache HttpClient
-            'HttpGet|HttpPost|HttpPut|HttpDelete',
-            'httpClient\\.execute',
-            
-            # OkHttp
-            'Request\\.Builder\\(\\)',
-            'okHttpClient\\.newCall',
-            
-            # Retrofit
-            '@(GET|POST|PUT|DELETE)\\(',
-            
-            # JAX-RS
-            '@Path\\(',
-        ]
+        # Independent of the URL being migrated, so only search once
+        if self._http_cache is not None:
+            return self._http_cache
         
-        python_patterns = [
-            # requests library
-            'requests\\.(get|post|put|delete|patch)',
-            
-            # urllib
-            'urllib\\.request\\.urlopen',
-            'urllib2\\.urlopen',
-            
-            # httpx
-            'httpx\\.(get|post|put|delete)',
-            
-            # aiohttp
-            'session\\.(get|post|put|delete)',
-            'aiohttp\\.ClientSession',
+        # One rg process per language: all patterns are compiled into a
+        # single matcher, so the tree is walked once instead of per pattern
+        # The report shows at most 3 matches per file, so rg can stop
+        # reading each file after the third
+        commands = [
+            ['rg', '-m', '3', *JVM_TYPES]
+            + [arg for pattern in self._JAVA_HTTP_PATTERNS for arg in ('-e', pattern)],
             
-            # FastAPI/Flask client calls
-            'client\\.(get|post|put|delete)',
+            ['rg', '-m', '3', *PY_TYPES]
+            + [arg for pattern in self._PYTHON_HTTP_PATTERNS for arg in ('-e', pattern)],
         ]
         
-        commands = []
-        
-        # Search Java files
-        for pattern in java_patterns:
-            commands.append(['rg', '--json', '-e', pattern, 
-                           '-g', '*.{java,kt,scala}', '-A', '5', '-B', '2', 
-                           self.project_root])
-        
-        # Search Python files
-        for pattern in python_patterns:
-            commands.append(['rg', '--json', '-e', pattern, 
-                           '-g', '*.py', '-A', '5', '-B', '2', 
-                           self.project_root])
-        
-        return self._execute_searches(commands)
+        self._http_cache = self._execute_searches(commands)
+        return self._http_cache
     
-    def trace_variable_usage(self, variable_name: str) -> Dict:
-        """Phase 4: Trace variable/method usage through the code"""
+    def trace_variable_usage(self, variable_name: str, use_regex: bool = False) -> Dict:
+        """Phase 4: Trace variable/method usage through the code
         
-        # Clean variable name (remove special chars that might interfere with regex)
-        clean_var = re.escape(variable_name)
+        By default the usage forms are searched as fixed strings, which lets
+        rg use its literal prefilter; pass use_regex=True to also match
+        assignments with arbitrary whitespace before the '='.
+        """
         
-        commands = [
-            # Find variable declarations/assignments
-            ['rg', '--json', f'{clean_var}\\s*=', '-g', '*.{java,py,kt,scala}', 
-             '-B', '2', '-A', '3', self.project_root],
+        if use_regex:
+            # Only files containing the name at all can match the regex
+            paths = self._candidate_files(variable_name, CODE_TYPES)
+            if paths == []:
+                return {}
             
-            # Find method calls using the variable
-            ['rg', '--json', f'{clean_var}\\.', '-g', '*.{java,py,kt,scala}', 
-             '-B', '2', '-A', '3', self.project_root],
+            # Clean variable name (remove special chars that might interfere with regex)
+            clean_var = _escape(variable_name)
             
-            # Find where variable is passed as parameter
-            ['rg', '--json', f'\\({clean_var}[,\\)]', '-g', '*.{java,py,kt,scala}', 
-             '-B', '2', '-A', '3', self.project_root],
-        ]
+            # Alternation of all usage forms, searched in a single pass
+            pattern = '|'.join([
+                # Find variable declarations/assignments
+                f'{clean_var}\\s*=',
+                
+                # Find method calls using the variable
+                f'{clean_var}\\.',
+                
+                # Find where variable is passed as parameter
+                f'\\({clean_var}[,\\)]',
+            ])
+            commands = [
+                ['rg', *CODE_TYPES, pattern],
+            ]
+        else:
+            # Already a literal search, so a literal prefilter gains nothing
+            paths = None
+            literals = [
+                # Find variable declarations/assignments
+                f'{variable_name} =',
+                f'{variable_name}=',
+                
+                # Find method calls using the variable
+                f'{variable_name}.',
+                
+                # Find where variable is passed as parameter
+                f'({variable_name},',
+                f'({variable_name})',
+            ]
+            commands = [
+                ['rg', '-F', *CODE_TYPES]
+                + [arg for literal in literals for arg in ('-e', literal)],
+            ]
         
-        return self._execute_searches(commands)
+        return self._execute_searches(commands, paths)
     
-    def _execute_searches(self, commands: List[List[str]]) -> Dict:
-        """Execute ripgrep commands and collect results"""
-        results = {}
+    def _candidate_files(self, literal: str,
+                         type_filters: List[str]) -> Optional[List[str]]:
+        """List files containing a fixed string, to narrow regex searches
+        
+        Returns None when more than _MAX_CANDIDATES files match, meaning the
+        caller should search the project root instead.
+        """
+        # -e so a literal starting with '-' isn't parsed as a flag
+        cmd = ['rg', '--no-config', *RG_TUNING, '-l', '-F', '-e', literal,
+               *type_filters, self.project_root]
+        
+        candidates = []
+        with subprocess.Popen(cmd, stdout=subprocess.PIPE,
+                              stderr=subprocess.DEVNULL) as proc:
+            for path in proc.stdout:
+                candidates.append(os.fsdecode(path.rstrip(b'\n')))
+                if len(candidates) > self._MAX_CANDIDATES:
+                    proc.kill()
+                    return None
+        return candidates
+    
+    def _execute_searches(self, commands: List[List[str]],
+                          paths: Optional[List[str]] = None) -> Dict:
+        """Execute ripgrep commands and collect results
+        
+        Each command is run over paths (default: the project root), which are
+        kept out of the stored search pattern.
+        """
+        if paths is None:
+            paths = [self.project_root]
+        
+        # Columnar per-file storage: parallel line/content/pattern columns,
+        # with line numbers unboxed in an int array
+        results = defaultdict(
+            lambda: {'lines': array('i'), 'contents': [], 'patterns': []})
+        # Commands often overlap, so record each (file, line) only once
+        seen: Set[tuple] = set()
         
         for cmd in commands:
-            try:
-                result = subprocess.run(cmd, capture_output=True, text=True)
-                if result.stdout:
-                    # Parse ripgrep JSON output
-                    for line in result.stdout.strip().split('\n'):
-                        if line:
-                            try:
-                                match = json.loads(line)
-                                if match.get('type') == 'match':
-                                    file_path = match['data']['path']['text']
-                                    line_num = match['data']['line_number']
-                                    content = match['data']['lines']['text']
-                                    
-                                    if file_path not in results:
-                                        results[file_path] = []
-                                    
-                                    results[file_path].append({
-                                        'line': line_num,
-                                        'content': content,
-                                        'pattern': ' '.join(cmd[2:])  # Store the search pattern
-                                    })
-                            except json.JSONDecodeError:
-                                continue
-            except subprocess.CalledProcessError:
-                continue
+            pattern = sys.intern(' '.join(cmd[1:]))  # Store the search pattern
+            # Always spawns rg: rgbind.search (see rgbind-rs/) has no -i, -F,
+            # -m, multi-pattern or custom-type options, which these searches use.
+            # Stream rg's output and parse each match line as it arrives,
+            # rather than buffering the whole output in memory first
+            rg_cmd = cmd[:1] + RG_TUNING + RG_MATCH_FORMAT + cmd[1:] + paths
+            with subprocess.Popen(rg_cmd, stdout=subprocess.PIPE,
+                                  stderr=subprocess.DEVNULL,
+                                  bufsize=1024 * 1024) as proc:
+                for line in proc.stdout:
+                    path, sep, rest = line.partition(b'\0')
+                    line_num, _, content = rest.partition(b':')
+                    if not sep or not line_num.isdigit():
+                        continue
+                    # rg repeats the path for every match in a file
+                    file_path = sys.intern(os.fsdecode(path))
+                    line_no = int(line_num)
+                    key = (file_path, line_no)
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    
+                    data = results[file_path]
+                    data['lines'].append(line_no)
+                    data['contents'].append(content.decode('utf-8', 'replace'))
+                    data['patterns'].append(pattern)
         
-        return results
+        return dict(results)
 
     def generate_migration_report(self, url: str) -> str:
         """Generate a comprehensive report for migrating a specific endpoint"""
-        report = f"\n{'='*60}\nMigration Report for: {url}\n{'='*60}\n\n"
+        # Collected in a list and joined once; repeated += is quadratic
+        report = [f"\n{'='*60}\nMigration Report for: {url}\n{'='*60}\n\n"]
         
         # Phase 1: Direct URL search
         direct_refs = self.search_literal_urls(url)
-        report += "1. DIRECT URL REFERENCES:\n"
-        for file, matches in direct_refs.items():
-            report += f"  📁 {file}\n"
-            for match in matches:
-                report += f"    Line {match['line']}: {match['content'].strip()}\n"
+        report.append("1. DIRECT URL REFERENCES:\n")
+        for file, data in direct_refs.items():
+            report.append(f"  📁 {file}\n")
+            for line, content in zip(data['lines'], data['contents']):
+                report.append(f"    Line {line}: {content.strip()}\n")
         
         # Extract property keys if found in config files
         property_keys = self._extract_property_keys(direct_refs)
         
         if property_keys:
-            report += f"\n2. PROPERTY KEYS FOUND: {property_keys}\n\n"
+            report.append(f"\n2. PROPERTY KEYS FOUND: {property_keys}\n\n")
             
             # Phase 2: Search for property usage
             for prop_key in property_keys:
                 prop_refs = self.search_property_references(prop_key)
-                report += f"  Property '{prop_key}' used in:\n"
-                for file, matches in prop_refs.items():
-                    report += f"    📁 {file}\n"
-                    for match in matches:
-                        report += f"      Line {match['line']}: {match['content'].strip()}\n"
+                report.append(f"  Property '{prop_key}' used in:\n")
+                for file, data in prop_refs.items():
+                    report.append(f"    📁 {file}\n")
+                    for line, content in zip(data['lines'], data['contents']):
+                        report.append(f"      Line {line}: {content.strip()}\n")
         
         # Phase 3: Find HTTP calls
         http_calls = self.search_http_calls()
-        report += "\n3. HTTP CLIENT USAGE PATTERNS:\n"
-        for file, matches in http_calls.items():
-            report += f"  📁 {file}\n"
-            for match in matches[:3]:  # Limit to first 3 matches per file
-                report += f"    Line {match['line']}: {match['content'].strip()}\n"
+        report.append("\n3. HTTP CLIENT USAGE PATTERNS:\n")
+        for file, data in http_calls.items():
+            report.append(f"  📁 {file}\n")
+            # Limit to first 3 matches per file
+            for line, content in zip(data['lines'][:3], data['contents'][:3]):
+                report.append(f"    Line {line}: {content.strip()}\n")
         
-        return report
+        return ''.join(report)
     
     def _extract_property_keys(self, search_results: Dict) -> Set[str]:
         """Extract property keys from configuration files"""
         property_keys = set()
         
-        for file_path, matches in search_results.items():
-            if any(ext in file_path for ext in ['.properties', '.yml', '.yaml', '.env']):
-                for match in matches:
-                    # Extract property key from line like: api.url=https://...
-                    content = match['content']
-                    if '=' in content:
-                        key = content.split('=')[0].strip()
-                        property_keys.add(key)
-                    elif ':' in content:  # YAML format
-                        key = content.split(':')[0].strip()
-                        property_keys.add(key)
+        for file_path, data in search_results.items():
+            path = Path(file_path)
+            # A bare dotfile like ".env" has no suffix, so fall back to its name
+            if (path.suffix or path.name) not in _CONFIG_EXTS:
+                continue
+            # The same config lines recur across URLs, so parse each
+            # file's hits once
+            property_keys.update(_keys_from_lines(tuple(data['contents'])))
         
         return property_keys
\ No newline at end of file